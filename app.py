@@ -1,21 +1,32 @@
 # app.py
-import json
 import os
 import sqlite3
+import threading
 import uuid
 import hashlib
+import asyncio
 import inspect
-from datetime import datetime
+import io
+import logging
+import time
+from collections import OrderedDict
+from contextlib import asynccontextmanager, contextmanager, suppress
+from functools import lru_cache
+from pathlib import Path
 from typing import Literal, Optional
 
+import orjson
 from dotenv import load_dotenv
 from fastapi import FastAPI, HTTPException
-from pydantic import BaseModel
+from fastapi.responses import JSONResponse, Response, StreamingResponse
+from pydantic import BaseModel, ConfigDict
 
 from backboard import BackboardClient
 
 load_dotenv()
 
+log = logging.getLogger("shadowbrief")
+
 BB_API_KEY = os.getenv("BACKBOARD_API_KEY")
 bb = BackboardClient(api_key=BB_API_KEY) if BB_API_KEY else None
 
@@ -28,21 +39,118 @@ REASON_MODEL = os.getenv("SB_REASON_MODEL", "gemini-2.5-pro")
 MEMORY_PROVIDER = os.getenv("SB_MEMORY_PROVIDER", "google")
 MEMORY_MODEL = os.getenv("SB_MEMORY_MODEL", "gemini-2.5-flash-lite")
 
+# llm_cache "thread" under which ALIGN results are shared by every user.
+ALIGN_CACHE_SCOPE = "__align__"
+
 ActionType = Literal["EXPLAIN", "ARGUMENT", "VOTE", "ALIGN"]
 VoteType = Literal["AGREE", "DISAGREE", "UNSURE"]
 
+class ORJSONResponse(JSONResponse):
+    """JSONResponse rendered by orjson.
+
+    Same render as FastAPI's own ORJSONResponse, which newer FastAPI deprecates
+    (warning on every response) in favor of response models we don't use.
+    """
+
+    def render(self, content) -> bytes:
+        return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS)
+
+
+@asynccontextmanager
+async def _lifespan(_app: FastAPI):
+    # Startup: schema/seed and the log writer (both defined further down).
+    global _log_queue, _log_task
+    init_db()
+    _log_queue = asyncio.Queue()
+    _log_task = asyncio.create_task(_log_writer())
+    yield
+    # Shutdown: stop the writer, flush what's still queued, close the LLM client.
+    _log_task.cancel()
+    with suppress(asyncio.CancelledError):
+        await _log_task
+    pending = _drain_log_queue([])
+    _log_queue = None
+    if pending:
+        try:
+            _write_log_batch(pending)
+        except Exception:
+            log.exception("failed to write %d queued messages", len(pending))
+    # `bb` owns one pooled httpx client shared by every LLM call; release its connections.
+    close = getattr(bb, "aclose", None)
+    if close is not None:
+        await close()
+
+
 # Root app + mounted API (so frontend can call /api/*)
-app = FastAPI(title="ShadowBrief (Local Mode)")
-api = FastAPI(title="ShadowBrief API (Local Mode)")
+app = FastAPI(title="ShadowBrief (Local Mode)", default_response_class=ORJSONResponse, lifespan=_lifespan)
+api = FastAPI(title="ShadowBrief API (Local Mode)", default_response_class=ORJSONResponse)
 app.mount("/api", api)
 
 DB_PATH = os.getenv("SHADOWBRIEF_DB_PATH", "shadowbrief.db")
-conn = sqlite3.connect(DB_PATH, check_same_thread=False)
+conn = sqlite3.connect(DB_PATH, check_same_thread=False, cached_statements=512)
 conn.row_factory = sqlite3.Row
 cur = conn.cursor()
 
+
+def _tune_conn(c: sqlite3.Connection) -> None:
+    # WAL lets readers run alongside the writer; NORMAL sync only fsyncs at checkpoints.
+    c.execute("PRAGMA journal_mode=WAL")
+    c.execute("PRAGMA synchronous=NORMAL")
+    c.execute("PRAGMA temp_store=MEMORY")
+    c.execute("PRAGMA cache_size=-65536")
+    c.execute("PRAGMA mmap_size=268435456")
+    c.execute("PRAGMA busy_timeout=5000")
+
+
+_tune_conn(conn)
+
+# All writes go through `conn` under this lock; reads use per-thread read-only connections.
+_write_lock = threading.RLock()
+_txn_open = False
+_ro_local = threading.local()
+
+
+@contextmanager
+def txn():
+    """Run a group of writes as one transaction (a single commit).
+
+    Nested calls join the outer transaction. Only wrap synchronous code:
+    holding this across an await would block every other writer.
+    """
+    global _txn_open
+    with _write_lock:
+        if _txn_open:
+            yield
+            return
+        cur.execute("BEGIN IMMEDIATE")
+        _txn_open = True
+        try:
+            yield
+        except BaseException:
+            conn.rollback()
+            raise
+        else:
+            conn.commit()
+        finally:
+            _txn_open = False
+
+
+def ro_cur() -> sqlite3.Cursor:
+    """Cursor on this thread's read-only connection (opened lazily).
+
+    Rows come back as plain tuples; read paths unpack them positionally.
+    """
+    c = getattr(_ro_local, "cur", None)
+    if c is None:
+        # as_uri() percent-encodes '#', '?' and '%' in the path, which a raw f-string would not.
+        ro_conn = sqlite3.connect(Path(DB_PATH).resolve().as_uri() + "?mode=ro", uri=True, cached_statements=512)
+        _tune_conn(ro_conn)
+        c = _ro_local.cur = ro_conn.cursor()
+    return c
+
+
 # ---------------- Fixed topic ontology ----------------
-FIXED_TOPICS = [
+FIXED_TOPICS = (
     "interest rates",
     "inflation",
     "monetary policy",
@@ -69,166 +177,264 @@ FIXED_TOPICS = [
     "economic sanctions",
     "ai policy",
     "tech policy",
-]
+)
+FIXED_TOPICS_SET = frozenset(FIXED_TOPICS)
+FIXED_TOPICS_JOINED = ", ".join(FIXED_TOPICS)
 
 # ---------------- DB schema ----------------
-cur.execute(
+# Columns added to beliefs after the table was first created.
+_BELIEF_LATE_COLS = {
+    "note": "TEXT",
+    "belief_key": "TEXT",
+    "belief_text": "TEXT",
+    "confidence": "TEXT",
+    "conditions_json": "TEXT",
+    "claim": "TEXT",
+}
+
+
+def init_db() -> None:
+    """Create tables/indexes, add missing belief columns, and seed demo data.
+
+    Runs once at startup inside a single IMMEDIATE transaction, so several
+    workers starting together serialize on SQLite's write lock.
     """
-CREATE TABLE IF NOT EXISTS users (
-  user_id TEXT PRIMARY KEY,
-  assistant_id TEXT NOT NULL
-)
+    with txn():
+        cur.execute(
+            """
+            CREATE TABLE IF NOT EXISTS users (
+              user_id TEXT PRIMARY KEY,
+              assistant_id TEXT NOT NULL
+            )
+            """
+        )
+
+        cur.execute(
+            """
+            CREATE TABLE IF NOT EXISTS threads (
+              user_id TEXT NOT NULL,
+              article_id TEXT NOT NULL,
+              thread_id TEXT NOT NULL,
+              PRIMARY KEY (user_id, article_id)
+            )
+            """
+        )
+
+        cur.execute(
+            """
+            CREATE TABLE IF NOT EXISTS articles (
+              id TEXT PRIMARY KEY,
+              title TEXT NOT NULL,
+              topic TEXT NOT NULL,
+              url TEXT,
+              content TEXT NOT NULL,
+              created_at DATETIME DEFAULT CURRENT_TIMESTAMP
+            )
+            """
+        )
+        cur.execute("CREATE INDEX IF NOT EXISTS idx_articles_time ON articles(created_at DESC)")
+        cur.execute("CREATE INDEX IF NOT EXISTS idx_articles_topic_time ON articles(topic, created_at DESC)")
+
+        cur.execute(
+            """
+            CREATE TABLE IF NOT EXISTS beliefs (
+              id INTEGER PRIMARY KEY AUTOINCREMENT,
+              user_id TEXT NOT NULL,
+              topic TEXT NOT NULL,
+              stance TEXT NOT NULL,
+              note TEXT,
+              evidence TEXT,
+              created_at DATETIME DEFAULT CURRENT_TIMESTAMP
+            )
+            """
+        )
+
+        cur.execute(
+            """
+            CREATE TABLE IF NOT EXISTS local_messages (
+              id INTEGER PRIMARY KEY AUTOINCREMENT,
+              thread_id TEXT NOT NULL,
+              role TEXT NOT NULL,
+              action TEXT,
+              content TEXT NOT NULL,
+              created_at DATETIME DEFAULT CURRENT_TIMESTAMP
+            )
+            """
+        )
+
+        cur.execute(
+            """
+            CREATE TABLE IF NOT EXISTS llm_cache (
+              thread_id TEXT NOT NULL,
+              action TEXT NOT NULL,
+              cache_key TEXT NOT NULL,
+              response_json TEXT NOT NULL,
+              model_name TEXT,
+              llm_provider TEXT,
+              created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+              PRIMARY KEY (thread_id, action, cache_key)
+            )
+            """
+        )
+        # Lookups hit the (thread_id, action, cache_key) key index; this one only cost writes.
+        cur.execute("DROP INDEX IF EXISTS idx_cache_thread_action")
+        cur.execute("CREATE INDEX IF NOT EXISTS idx_beliefs_user_time ON beliefs(user_id, created_at DESC)")
+        cur.execute("CREATE INDEX IF NOT EXISTS idx_beliefs_user_topic_time ON beliefs(user_id, topic, created_at DESC)")
+        cur.execute("CREATE INDEX IF NOT EXISTS idx_msgs_thread_time ON local_messages(thread_id, created_at DESC)")
+
+        existing = {r[1] for r in cur.execute("PRAGMA table_info(beliefs)").fetchall()}
+        for col, col_type in _BELIEF_LATE_COLS.items():
+            if col not in existing:
+                cur.execute(f"ALTER TABLE beliefs ADD COLUMN {col} {col_type}")
+
+        seed_if_empty()
+
+        # Refresh planner stats so the composite indexes above keep winning as tables grow.
+        # 0x10000 makes SQLite >= 3.46 check every table at open; older versions ignore it.
+        cur.execute("PRAGMA optimize=0x10002")
+
+
+# ---------------- Hot SQL ----------------
+# Shared literals so each connection's prepared-statement cache hits on every call.
+SQL_CACHE_GET = """
+SELECT response_json, model_name, llm_provider, created_at
+FROM llm_cache
+WHERE thread_id=? AND action=? AND cache_key=?
 """
-)
 
-cur.execute(
-    """
-CREATE TABLE IF NOT EXISTS threads (
-  user_id TEXT NOT NULL,
-  article_id TEXT NOT NULL,
-  thread_id TEXT NOT NULL,
-  PRIMARY KEY (user_id, article_id)
-)
+SQL_CACHE_PUT = """
+INSERT INTO llm_cache(thread_id, action, cache_key, response_json, model_name, llm_provider)
+VALUES (?,?,?,?,?,?)
+ON CONFLICT(thread_id, action, cache_key) DO UPDATE SET
+    response_json=excluded.response_json,
+    model_name=excluded.model_name,
+    llm_provider=excluded.llm_provider,
+    created_at=CURRENT_TIMESTAMP
 """
-)
 
-cur.execute(
-    """
-CREATE TABLE IF NOT EXISTS articles (
-  id TEXT PRIMARY KEY,
-  title TEXT NOT NULL,
-  topic TEXT NOT NULL,
-  url TEXT,
-  content TEXT NOT NULL,
-  created_at DATETIME DEFAULT CURRENT_TIMESTAMP
-)
+SQL_LOG_MESSAGE = "INSERT INTO local_messages(thread_id, role, action, content) VALUES(?,?,?,?)"
+
+SQL_LIST_ARTICLES_JSON = """
+SELECT json_group_array(json_object('id', id, 'title', title, 'topic', topic, 'created_at', created_at))
+FROM (SELECT id, title, topic, created_at FROM articles ORDER BY created_at DESC LIMIT 200)
 """
-)
-cur.execute("CREATE INDEX IF NOT EXISTS idx_articles_time ON articles(created_at DESC)")
-cur.execute("CREATE INDEX IF NOT EXISTS idx_articles_topic_time ON articles(topic, created_at DESC)")
 
-cur.execute(
-    """
-CREATE TABLE IF NOT EXISTS beliefs (
-  id INTEGER PRIMARY KEY AUTOINCREMENT,
-  user_id TEXT NOT NULL,
-  topic TEXT NOT NULL,
-  stance TEXT NOT NULL,
-  note TEXT,
-  evidence TEXT,
-  created_at DATETIME DEFAULT CURRENT_TIMESTAMP
+# Newest `limit` messages via the (thread_id, created_at DESC) index, returned oldest first.
+SQL_THREAD_MESSAGES = """
+SELECT role, action, content, created_at
+FROM (
+    SELECT id, role, action, content, created_at
+    FROM local_messages
+    WHERE thread_id=?
+    ORDER BY created_at DESC
+    LIMIT ?
 )
+ORDER BY created_at, id
 """
-)
 
-cur.execute(
-    """
-CREATE TABLE IF NOT EXISTS local_messages (
-  id INTEGER PRIMARY KEY AUTOINCREMENT,
-  thread_id TEXT NOT NULL,
-  role TEXT NOT NULL,
-  action TEXT,
-  content TEXT NOT NULL,
-  created_at DATETIME DEFAULT CURRENT_TIMESTAMP
-)
+SQL_INSERT_BELIEF = """
+INSERT INTO beliefs(
+    user_id, topic, stance, note, evidence,
+    belief_key, belief_text, confidence, conditions_json, claim
+) VALUES (?,?,?,?,?,?,?,?,?,?)
 """
-)
 
-cur.execute(
-    """
-CREATE TABLE IF NOT EXISTS llm_cache (
-  id INTEGER PRIMARY KEY AUTOINCREMENT,
-  thread_id TEXT NOT NULL,
-  action TEXT NOT NULL,
-  cache_key TEXT NOT NULL,
-  response_json TEXT NOT NULL,
-  model_name TEXT,
-  llm_provider TEXT,
-  created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
-  UNIQUE(thread_id, action, cache_key)
-)
+# evidence / conditions_json are validated in SQLite: anything that isn't a JSON
+# object / array comes back as '{}' / '[]', so Python can parse without guards.
+_SQL_BELIEFS_COLS = """
+       id, topic, stance, note,
+       CASE WHEN json_valid(evidence)
+            THEN CASE json_type(evidence) WHEN 'object' THEN evidence ELSE '{}' END
+            ELSE '{}' END,
+       created_at, belief_key, belief_text, confidence,
+       CASE WHEN json_valid(conditions_json)
+            THEN CASE json_type(conditions_json) WHEN 'array' THEN conditions_json ELSE '[]' END
+            ELSE '[]' END,
+       claim
 """
-)
-cur.execute("CREATE INDEX IF NOT EXISTS idx_cache_thread_action ON llm_cache(thread_id, action, created_at DESC)")
-cur.execute("CREATE INDEX IF NOT EXISTS idx_beliefs_user_time ON beliefs(user_id, created_at DESC)")
-cur.execute("CREATE INDEX IF NOT EXISTS idx_beliefs_user_topic_time ON beliefs(user_id, topic, created_at DESC)")
-cur.execute("CREATE INDEX IF NOT EXISTS idx_msgs_thread_time ON local_messages(thread_id, created_at DESC)")
-conn.commit()
+_SQL_BELIEFS_SELECT = "SELECT" + _SQL_BELIEFS_COLS + "FROM beliefs\n"
 
-# Migration: add note column if missing (safe)
-try:
-    cur.execute("ALTER TABLE beliefs ADD COLUMN note TEXT")
-    conn.commit()
-except sqlite3.OperationalError:
-    pass
+SQL_BELIEFS_RECENT = _SQL_BELIEFS_SELECT + """
+WHERE user_id=?
+ORDER BY created_at DESC
+LIMIT ?
+"""
 
+SQL_BELIEFS_RECENT_FOR_TOPIC = _SQL_BELIEFS_SELECT + """
+WHERE user_id=? AND topic=?
+ORDER BY created_at DESC
+LIMIT ?
+"""
 
-def _add_col(sql: str):
-    try:
-        cur.execute(sql)
-        conn.commit()
-    except sqlite3.OperationalError:
-        pass
+# Only what the belief-alert prompt reads: no evidence / conditions JSON to move or parse.
+SQL_BELIEF_BRIEFS_FOR_TOPIC = """
+SELECT id, stance, belief_key, belief_text, claim, created_at
+FROM beliefs
+WHERE user_id=? AND topic=?
+ORDER BY created_at DESC
+LIMIT ?
+"""
 
+# Newest `limit` beliefs per fixed topic in one pass; rows come back grouped by topic.
+SQL_BELIEFS_RECENT_PER_TOPIC = (
+    "SELECT" + _SQL_BELIEFS_COLS + """FROM (
+    SELECT *, ROW_NUMBER() OVER (PARTITION BY topic ORDER BY created_at DESC) AS rn
+    FROM beliefs
+    WHERE user_id=? AND topic IN (""" + ",".join("?" * len(FIXED_TOPICS)) + """)
+)
+WHERE rn <= ?
+ORDER BY topic, rn
+"""
+)
 
-# Belief enrichment columns (safe)
-_add_col("ALTER TABLE beliefs ADD COLUMN belief_key TEXT")
-_add_col("ALTER TABLE beliefs ADD COLUMN belief_text TEXT")
-_add_col("ALTER TABLE beliefs ADD COLUMN confidence TEXT")
-_add_col("ALTER TABLE beliefs ADD COLUMN conditions_json TEXT")
-_add_col("ALTER TABLE beliefs ADD COLUMN claim TEXT")
 
+_loads = orjson.loads
 
-def _safe_json(s: Optional[str]) -> dict:
-    if not s:
-        return {}
-    try:
-        s = (s or "").strip()
-        obj = json.loads(s)
-        return obj if isinstance(obj, dict) else {}
-    except Exception:
-        return {}
 
+def _dumps(obj) -> str:
+    return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS).decode("utf-8")
 
-def _safe_json_list(s: Optional[str]) -> list:
-    if not s:
-        return []
-    try:
-        s = (s or "").strip()
-        obj = json.loads(s)
-        return obj if isinstance(obj, list) else []
-    except Exception:
-        return []
+
+def _norm_text(s: str) -> str:
+    return " ".join((s or "").split()).casefold()
 
 
 def _mk_cache_key(parts: list[str]) -> str:
+    # sha256 stays: with CPU SHA extensions it beats stdlib blake2b/md5 on these
+    # 1-3 KB keys, and changing the hash would orphan every existing cache row.
+    # One C-level join + encode is also cheaper than per-part h.update() calls.
     h = hashlib.sha256("\n".join(parts).encode("utf-8")).hexdigest()
     return h[:24]
 
 
-class InitReq(BaseModel):
+class _Req(BaseModel):
+    # Request bodies are read-only once parsed; unknown fields are dropped, not validated.
+    model_config = ConfigDict(frozen=True, extra="ignore")
+
+
+class InitReq(_Req):
     user_id: str
 
 
-class ThreadReq(BaseModel):
+class ThreadReq(_Req):
     user_id: str
     article_id: str
 
 
-class IngestReq(BaseModel):
+class IngestReq(_Req):
     title: str
     content: str
     url: Optional[str] = None
 
 
-class IngestAndExplainReq(BaseModel):
+class IngestAndExplainReq(_Req):
     user_id: str
     title: str
     content: str
     url: Optional[str] = None
 
 
-class ActionReq(BaseModel):
+class ActionReq(_Req):
     user_id: str
     article_id: str
     action: ActionType
@@ -238,45 +444,82 @@ class ActionReq(BaseModel):
     note: Optional[str] = None
 
 
+# ---------------- In-process caches (memory -> SQLite -> LLM) ----------------
+class _LRU:
+    """Small thread-safe LRU map for hot lookups that would otherwise hit SQLite."""
+
+    def __init__(self, maxsize: int):
+        self.maxsize = maxsize
+        self._d: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            v = self._d.get(key)
+            if v is not None:
+                self._d.move_to_end(key)
+            return v
+
+    def put(self, key, value) -> None:
+        with self._lock:
+            self._d[key] = value
+            self._d.move_to_end(key)
+            if len(self._d) > self.maxsize:
+                self._d.popitem(last=False)
+
+
+# (thread_id, action, cache_key) -> (data, meta); articles are immutable once inserted.
+_llm_mem_cache = _LRU(4096)
+_article_mem_cache = _LRU(512)
+# user_id -> assistant_id and (user_id, article_id) -> thread_id never change once stored.
+_assistant_id_cache = _LRU(4096)
+_thread_id_cache = _LRU(10000)
+
+
+def _cache_hit(entry: tuple[dict, dict]) -> dict:
+    # Callers normalize the returned dict in place, so hand out copies.
+    data, meta = entry
+    return {"data": dict(data), "meta": dict(meta)}
+
+
 def cache_get(thread_id: str, action: str, cache_key: str) -> Optional[dict]:
-    row = cur.execute(
-        """
-        SELECT response_json, model_name, llm_provider, created_at
-        FROM llm_cache
-        WHERE thread_id=? AND action=? AND cache_key=?
-        ORDER BY created_at DESC
-        LIMIT 1
-        """,
-        (thread_id, action, cache_key),
-    ).fetchone()
+    key = (thread_id, action, cache_key)
+    entry = _llm_mem_cache.get(key)
+    if entry is not None:
+        return _cache_hit(entry)
+
+    row = ro_cur().execute(SQL_CACHE_GET, key).fetchone()
     if not row:
         return None
+    response_json, model_name, llm_provider, created_at = row
     try:
-        data = json.loads(row["response_json"])
+        data = _loads(response_json)
     except Exception:
         return None
-    return {
-        "data": data,
-        "meta": {
-            "model": row["model_name"],
-            "provider": row["llm_provider"],
-            "created_at": row["created_at"],
-            "cache": "HIT",
-        },
-    }
+    entry = (data, {"model": model_name, "provider": llm_provider, "created_at": created_at, "cache": "HIT"})
+    _llm_mem_cache.put(key, entry)
+    return _cache_hit(entry)
+
+
+async def cache_lookup(thread_id: str, action: str, cache_key: str) -> Optional[dict]:
+    """cache_get for async callers: memory inline, the SQLite fallback in the threadpool."""
+    entry = _llm_mem_cache.get((thread_id, action, cache_key))
+    if entry is not None:
+        return _cache_hit(entry)
+    return await asyncio.to_thread(cache_get, thread_id, action, cache_key)
 
 
 def cache_put(thread_id: str, action: str, cache_key: str, payload: dict, provider: str, model: str) -> None:
-    cur.execute(
-        """
-        INSERT OR REPLACE INTO llm_cache(thread_id, action, cache_key, response_json, model_name, llm_provider)
-        VALUES (?,?,?,?,?,?)
-        """,
-        (thread_id, action, cache_key, json.dumps(payload, ensure_ascii=False), model, provider),
+    with txn():
+        cur.execute(SQL_CACHE_PUT, (thread_id, action, cache_key, _dumps(payload), model, provider))
+    created_at = time.strftime("%Y-%m-%d %H:%M:%S", time.gmtime())
+    _llm_mem_cache.put(
+        (thread_id, action, cache_key),
+        (dict(payload), {"model": model, "provider": provider, "created_at": created_at, "cache": "HIT"}),
     )
-    conn.commit()
 
 
+@lru_cache(maxsize=64)
 def pick_model_for_action(action: str) -> tuple[str, str]:
     a = (action or "").upper()
     if a in {"EXPLAIN", "ARGUMENT", "TOPIC", "LEDGER"}:
@@ -286,10 +529,47 @@ def pick_model_for_action(action: str) -> tuple[str, str]:
     return FAST_PROVIDER, FAST_MODEL
 
 
+def _db_get_assistant_id(user_id: str) -> Optional[str]:
+    row = ro_cur().execute("SELECT assistant_id FROM users WHERE user_id=?", (user_id,)).fetchone()
+    return row[0] if row else None
+
+
+def _db_put_assistant_id(user_id: str, assistant_id: str) -> str:
+    # A concurrent request may have stored one first; keep theirs so everyone agrees.
+    with txn():
+        cur.execute("INSERT OR IGNORE INTO users(user_id, assistant_id) VALUES(?,?)", (user_id, assistant_id))
+        return cur.execute("SELECT assistant_id FROM users WHERE user_id=?", (user_id,)).fetchone()[0]
+
+
+def _db_get_thread_id(user_id: str, article_id: str) -> Optional[str]:
+    row = ro_cur().execute(
+        "SELECT thread_id FROM threads WHERE user_id=? AND article_id=?",
+        (user_id, article_id),
+    ).fetchone()
+    return row[0] if row else None
+
+
+def _db_put_thread_id(user_id: str, article_id: str, thread_id: str) -> str:
+    with txn():
+        cur.execute(
+            "INSERT OR IGNORE INTO threads(user_id, article_id, thread_id) VALUES(?,?,?)",
+            (user_id, article_id, thread_id),
+        )
+        return cur.execute(
+            "SELECT thread_id FROM threads WHERE user_id=? AND article_id=?",
+            (user_id, article_id),
+        ).fetchone()[0]
+
+
 async def get_or_create_assistant_backboard(user_id: str) -> str:
-    row = cur.execute("SELECT assistant_id FROM users WHERE user_id=?", (user_id,)).fetchone()
-    if row:
-        return row["assistant_id"]
+    assistant_id = _assistant_id_cache.get(user_id)
+    if assistant_id:
+        return assistant_id
+
+    assistant_id = await asyncio.to_thread(_db_get_assistant_id, user_id)
+    if assistant_id:
+        _assistant_id_cache.put(user_id, assistant_id)
+        return assistant_id
 
     if not bb:
         raise RuntimeError("BACKBOARD_API_KEY not set")
@@ -298,30 +578,26 @@ async def get_or_create_assistant_backboard(user_id: str) -> str:
         name=f"ShadowBrief ({user_id})",
         description="Extract arguments, handle challenges, and store user beliefs.",
     )
-    assistant_id = str(assistant.assistant_id)
-
-    cur.execute("INSERT INTO users(user_id, assistant_id) VALUES(?,?)", (user_id, assistant_id))
-    conn.commit()
+    assistant_id = await asyncio.to_thread(_db_put_assistant_id, user_id, str(assistant.assistant_id))
+    _assistant_id_cache.put(user_id, assistant_id)
     return assistant_id
 
 
 async def get_or_create_thread_backboard(user_id: str, article_id: str) -> str:
-    row = cur.execute(
-        "SELECT thread_id FROM threads WHERE user_id=? AND article_id=?",
-        (user_id, article_id),
-    ).fetchone()
-    if row:
-        return row["thread_id"]
+    key = (user_id, article_id)
+    thread_id = _thread_id_cache.get(key)
+    if thread_id:
+        return thread_id
+
+    thread_id = await asyncio.to_thread(_db_get_thread_id, user_id, article_id)
+    if thread_id:
+        _thread_id_cache.put(key, thread_id)
+        return thread_id
 
     assistant_id = await get_or_create_assistant_backboard(user_id)
     thread = await bb.create_thread(assistant_id)
-    thread_id = str(thread.thread_id)
-
-    cur.execute(
-        "INSERT INTO threads(user_id, article_id, thread_id) VALUES(?,?,?)",
-        (user_id, article_id, thread_id),
-    )
-    conn.commit()
+    thread_id = await asyncio.to_thread(_db_put_thread_id, user_id, article_id, str(thread.thread_id))
+    _thread_id_cache.put(key, thread_id)
     return thread_id
 
 
@@ -329,296 +605,428 @@ async def get_ingest_thread_backboard() -> str:
     return await get_or_create_thread_backboard("__system__", "__ingest__")
 
 
+async def discard_thread_backboard(thread_id: str) -> None:
+    """Best-effort delete of a Backboard thread we no longer need."""
+    delete = getattr(bb, "delete_thread", None)
+    if delete is None:
+        log.warning("Backboard client has no delete_thread; leaving thread %s", thread_id)
+        return
+    try:
+        await delete(thread_id)
+    except Exception:
+        log.exception("failed to delete Backboard thread %s", thread_id)
+
+
+@asynccontextmanager
+async def scratch_thread_backboard():
+    """A throwaway thread on the system assistant, deleted on exit."""
+    if not bb:
+        raise RuntimeError("BACKBOARD_API_KEY not set")
+    assistant_id = await get_or_create_assistant_backboard("__system__")
+    thread_id = str((await bb.create_thread(assistant_id)).thread_id)
+    try:
+        yield thread_id
+    finally:
+        await discard_thread_backboard(thread_id)
+
+
 def log_message(thread_id: str, role: str, content: str, action: Optional[str] = None) -> None:
-    cur.execute(
-        "INSERT INTO local_messages(thread_id, role, action, content) VALUES(?,?,?,?)",
-        (thread_id, role, action, content),
-    )
-    conn.commit()
+    with txn():
+        cur.execute(SQL_LOG_MESSAGE, (thread_id, role, action, content))
 
 
-def get_thread_messages(thread_id: str, limit: int = 200) -> list[dict]:
-    rows = cur.execute(
-        """
-        SELECT role, action, content, created_at
-        FROM local_messages
-        WHERE thread_id=?
-        ORDER BY created_at DESC
-        LIMIT ?
-        """,
-        (thread_id, limit),
-    ).fetchall()
-
-    return list(
-        reversed(
-            [
-                {"role": r["role"], "action": r["action"], "content": r["content"], "created_at": r["created_at"]}
-                for r in rows
-            ]
-        )
-    )
+# Deferred message log: routes enqueue rows and return; _log_writer commits them in batches.
+_log_queue: Optional[asyncio.Queue] = None
+_log_task: Optional[asyncio.Task] = None
+LOG_FLUSH_DELAY = 0.01
 
 
-def db_get_article(article_id: str) -> Optional[sqlite3.Row]:
-    return cur.execute(
-        "SELECT id, title, topic, url, content, created_at FROM articles WHERE id=?",
-        (article_id,),
-    ).fetchone()
+def log_message_later(thread_id: str, role: str, content: str, action: Optional[str] = None) -> None:
+    if _log_queue is None:
+        log_message(thread_id, role, content, action=action)
+        return
+    _log_queue.put_nowait((thread_id, role, action, content))
+
+
+def _write_log_batch(batch: list[tuple]) -> None:
+    with txn():
+        cur.executemany(SQL_LOG_MESSAGE, batch)
+
+
+def _drain_log_queue(batch: list[tuple]) -> list[tuple]:
+    while not _log_queue.empty():
+        batch.append(_log_queue.get_nowait())
+    return batch
+
+
+async def _log_writer() -> None:
+    while True:
+        batch = [await _log_queue.get()]
+        try:
+            await asyncio.sleep(LOG_FLUSH_DELAY)
+        except asyncio.CancelledError:
+            # Shutting down: don't drop what we already took off the queue. A failed
+            # write must not replace the CancelledError, or shutdown stops short.
+            try:
+                _write_log_batch(_drain_log_queue(batch))
+            except Exception:
+                log.exception("failed to write %d queued messages", len(batch))
+            raise
+        try:
+            await asyncio.to_thread(_write_log_batch, _drain_log_queue(batch))
+        except Exception:
+            log.exception("failed to write %d queued messages", len(batch))
+
+
+def get_thread_messages(thread_id: str, limit: int = 200) -> list[dict]:
+    rows = ro_cur().execute(SQL_THREAD_MESSAGES, (thread_id, limit))
+    return [
+        {"role": role, "action": action, "content": content, "created_at": created_at}
+        for role, action, content, created_at in rows
+    ]
+
+
+def db_get_article(article_id: str) -> Optional[tuple]:
+    """(id, title, topic, url, content, created_at) or None."""
+    row = _article_mem_cache.get(article_id)
+    if row is None:
+        row = ro_cur().execute(
+            "SELECT id, title, topic, url, content, created_at FROM articles WHERE id=?",
+            (article_id,),
+        ).fetchone()
+        if row is not None:
+            _article_mem_cache.put(article_id, row)
+    return row
+
+
+def insert_article(article_id: str, title: str, topic: str, url: Optional[str], content: str) -> None:
+    with txn():
+        cur.execute(
+            "INSERT INTO articles(id, title, topic, url, content) VALUES (?,?,?,?,?)",
+            (article_id, title, topic, url, content),
+        )
 
 
 def get_article_text(article_id: str, max_chars: int = 60000) -> str:
     row = db_get_article(article_id)
     if not row:
         return f"[Unknown article_id: {article_id}]"
-    return (row["content"] or "")[:max_chars]
-
-
-def fetch_recent_beliefs(user_id: str, limit: int = 20) -> list[dict]:
-    rows = cur.execute(
-        """
-        SELECT id, topic, stance, note, evidence, created_at,
-               belief_key, belief_text, confidence, conditions_json, claim
-        FROM beliefs
-        WHERE user_id=?
-        ORDER BY created_at DESC
-        LIMIT ?
-        """,
-        (user_id, limit),
-    ).fetchall()
-
-    out: list[dict] = []
-    for r in rows:
-        out.append(
-            {
-                "id": r["id"],
-                "topic": r["topic"],
-                "stance": r["stance"],
-                "note": r["note"],
-                "evidence": _safe_json(r["evidence"]),
-                "created_at": r["created_at"],
-                "belief_key": r["belief_key"],
-                "belief_text": r["belief_text"],
-                "confidence": r["confidence"],
-                "conditions": _safe_json_list(r["conditions_json"]),
-                "claim": r["claim"],
-            }
-        )
+    return (row[4] or "")[:max_chars]
+
+
+def _belief_dict(r: tuple) -> dict:
+    """Map a row from _SQL_BELIEFS_SELECT."""
+    (id_, topic, stance, note, evidence, created_at,
+     belief_key, belief_text, confidence, conditions_json, claim) = r
+    return {
+        "id": id_,
+        "topic": topic,
+        "stance": stance,
+        "note": note,
+        "evidence": _loads(evidence),
+        "created_at": created_at,
+        "belief_key": belief_key,
+        "belief_text": belief_text,
+        "confidence": confidence,
+        "conditions": _loads(conditions_json),
+        "claim": claim,
+    }
+
+
+def fetch_recent_beliefs(user_id: str, topic: Optional[str] = None, limit: int = 20) -> list[dict]:
+    """Newest beliefs for a user, optionally restricted to one topic."""
+    if topic is None:
+        rows = ro_cur().execute(SQL_BELIEFS_RECENT, (user_id, limit))
+    else:
+        rows = ro_cur().execute(SQL_BELIEFS_RECENT_FOR_TOPIC, (user_id, topic, limit))
+    return [_belief_dict(r) for r in rows]
+
+
+def fetch_recent_belief_briefs(user_id: str, topic: str, limit: int = 12) -> list[dict]:
+    """Newest beliefs on a topic with just the fields compare_beliefs_for_alert uses."""
+    rows = ro_cur().execute(SQL_BELIEF_BRIEFS_FOR_TOPIC, (user_id, topic, limit))
+    return [
+        {
+            "id": id_,
+            "stance": stance,
+            "belief_key": belief_key,
+            "belief_text": belief_text,
+            "claim": claim,
+            "created_at": created_at,
+        }
+        for id_, stance, belief_key, belief_text, claim, created_at in rows
+    ]
+
+
+def fetch_recent_beliefs_by_topic(user_id: str, limit: int = 20) -> dict[str, list[dict]]:
+    """Newest `limit` beliefs for each fixed topic, keyed by topic (empty topics omitted)."""
+    out: dict[str, list[dict]] = {}
+    for r in ro_cur().execute(SQL_BELIEFS_RECENT_PER_TOPIC, (user_id, *FIXED_TOPICS, limit)):
+        out.setdefault(r[1], []).append(_belief_dict(r))
     return out
 
 
-def fetch_recent_beliefs_for_topic(user_id: str, topic: str, limit: int = 20) -> list[dict]:
-    rows = cur.execute(
-        """
-        SELECT id, topic, stance, note, evidence, created_at,
-               belief_key, belief_text, confidence, conditions_json, claim
-        FROM beliefs
-        WHERE user_id=? AND topic=?
-        ORDER BY created_at DESC
-        LIMIT ?
-        """,
-        (user_id, topic, limit),
-    ).fetchall()
-
-    out: list[dict] = []
-    for r in rows:
-        out.append(
-            {
-                "id": r["id"],
-                "topic": r["topic"],
-                "stance": r["stance"],
-                "note": r["note"],
-                "evidence": _safe_json(r["evidence"]),
-                "created_at": r["created_at"],
-                "belief_key": r["belief_key"],
-                "belief_text": r["belief_text"],
-                "confidence": r["confidence"],
-                "conditions": _safe_json_list(r["conditions_json"]),
-                "claim": r["claim"],
-            }
+def _extract_text(resp) -> str:
+    if resp is None:
+        return ""
+    if isinstance(resp, dict):
+        return str(resp.get("content") or resp.get("text") or resp.get("message") or "").strip()
+    return str(
+        getattr(resp, "content", None)
+        or getattr(resp, "text", None)
+        or getattr(resp, "message", None)
+        or ""
+    ).strip()
+
+
+
+
+def _strip_json_fences(s: str) -> str:
+    s = (s or "").strip()
+    if not s:
+        return ""
+    # First { through last } also drops ```json fences and any prose around them
+    i = s.find("{")
+    j = s.rfind("}")
+    if i != -1 and j > i:
+        return s[i : j + 1]
+    # No object at all: just remove ```json ... ``` or ``` ... ```
+    nl = s.find("\n")
+    if not s.startswith("```") or nl == -1:
+        return s
+    body = s[nl + 1 :]
+    if body.endswith("```"):
+        body = body[:-3]
+    return body.strip()
+
+
+async def _bb_stream_chunks(thread_id: str, prompt: str, provider: str, model: str):
+    """Yield content chunks from a streaming Backboard call."""
+    stream = bb.add_message(
+        thread_id=thread_id,
+        content=prompt,
+        llm_provider=provider,
+        model_name=model,
+        stream=True,
+    )
+    if inspect.iscoroutine(stream):
+        stream = await stream
+
+    async for event in stream:
+        if not isinstance(event, dict):
+            continue
+        et = event.get("type")
+        if et == "content_streaming":
+            chunk = event.get("content", "") or ""
+            if chunk:
+                yield chunk
+        elif et in {"error", "exception"}:
+            raise RuntimeError(f"Backboard stream error: {event}")
+
+
+async def _bb_text(thread_id: str, prompt: str, provider: str, model: str) -> str:
+    # Prefer non-streaming
+    try:
+        resp = bb.add_message(
+            thread_id=thread_id,
+            content=prompt,
+            llm_provider=provider,
+            model_name=model,
+            stream=False,
         )
-    return out
+        if inspect.iscoroutine(resp):
+            resp = await resp
+        text = _extract_text(resp)
+        if text:
+            return text
+    except TypeError:
+        pass
+    except Exception:
+        pass
+
+    # Streaming fallback
+    buf = io.StringIO()
+    async for chunk in _bb_stream_chunks(thread_id, prompt, provider, model):
+        buf.write(chunk)
+    return buf.getvalue().strip()
+
+
+def _parse_llm_json(raw: str, tag: str, provider: str, model: str) -> dict:
+    cooked = _strip_json_fences(raw)
+    if not cooked:
+        raise RuntimeError(f"[{tag}] Empty LLM response after cleanup. provider={provider} model={model}")
+
+    try:
+        obj = _loads(cooked)
+    except Exception as e:
+        preview = cooked[:700]
+        raise RuntimeError(
+            f"[{tag}] Invalid JSON from LLM after cleanup. provider={provider} model={model} "
+            f"len={len(cooked)} preview={preview!r}"
+        ) from e
+
+    if not isinstance(obj, dict):
+        raise RuntimeError(f"[{tag}] JSON was not an object. provider={provider} model={model} type={type(obj)}")
+    return obj
+
 
+def _repair_prompt(prompt: str) -> str:
+    return (
+        "Output ONLY raw JSON with no markdown, no triple backticks, no prose.\n"
+        "Return ONLY the JSON object.\n\n"
+        "ORIGINAL INSTRUCTION:\n" + prompt
+    )
 
-async def bb_json(thread_id: str, prompt: str, action: str, cache_key: Optional[str] = None) -> tuple[dict, dict]:
+
+async def bb_json(
+    thread_id: str,
+    prompt: str,
+    action: str,
+    cache_key: Optional[str] = None,
+    cache_scope: Optional[str] = None,
+) -> tuple[dict, dict]:
+    """Run `prompt` on `thread_id` and parse the JSON reply.
+
+    Cache rows are keyed by `cache_scope` when given (to share results across
+    threads), otherwise by `thread_id`.
+    """
     provider, model = pick_model_for_action(action)
 
     if not bb:
         raise RuntimeError("BACKBOARD_API_KEY not set")
 
+    cache_thread = cache_scope or thread_id
+
     # -------- cache --------
     if cache_key:
-        hit = cache_get(thread_id, action, cache_key)
+        hit = await cache_lookup(cache_thread, action, cache_key)
         if hit:
             meta = hit["meta"] | {"cache": "HIT"}
             return hit["data"], meta
 
-    def _extract_text(resp) -> str:
-        if resp is None:
-            return ""
-        if isinstance(resp, dict):
-            return str(resp.get("content") or resp.get("text") or resp.get("message") or "").strip()
-        return str(
-            getattr(resp, "content", None)
-            or getattr(resp, "text", None)
-            or getattr(resp, "message", None)
-            or ""
-        ).strip()
-
-    def _strip_json_fences(s: str) -> str:
-        s = (s or "").strip()
-        if not s:
-            return ""
-        # Remove ```json ... ``` or ``` ... ```
-        if s.startswith("```"):
-            # drop first fence line
-            first_nl = s.find("\n")
-            if first_nl != -1:
-                s = s[first_nl + 1 :]
-            # drop ending fence
-            if s.rstrip().endswith("```"):
-                s = s.rstrip()
-                s = s[: -3]
-            s = s.strip()
-
-        # If model added extra text, try to slice the first {...} block
-        if "{" in s and "}" in s:
-            i = s.find("{")
-            j = s.rfind("}")
-            if i != -1 and j != -1 and j > i:
-                s = s[i : j + 1].strip()
-        return s
+    # -------- main call --------
+    text1 = await _bb_text(thread_id, prompt, provider, model)
+    try:
+        out = _parse_llm_json(text1, "FIRST", provider, model)
+    except Exception:
+        text2 = await _bb_text(thread_id, _repair_prompt(prompt), provider, model)
+        out = _parse_llm_json(text2, "REPAIR", provider, model)
 
-    async def run_once(p: str) -> str:
-        # Prefer non-streaming
-        try:
-            resp = bb.add_message(
-                thread_id=thread_id,
-                content=p,
-                llm_provider=provider,
-                model_name=model,
-                stream=False,
-            )
-            if inspect.iscoroutine(resp):
-                resp = await resp
-            text = _extract_text(resp)
-            if text:
-                return text
-        except TypeError:
-            pass
-        except Exception:
-            pass
+    if cache_key:
+        await asyncio.to_thread(cache_put, cache_thread, action, cache_key, out, provider, model)
 
-        # Streaming fallback
-        chunks: list[str] = []
-        stream = bb.add_message(
-            thread_id=thread_id,
-            content=p,
-            llm_provider=provider,
-            model_name=model,
-            stream=True,
-        )
-        if inspect.iscoroutine(stream):
-            stream = await stream
-
-        async for event in stream:
-            if not isinstance(event, dict):
-                continue
-            et = event.get("type")
-            if et == "content_streaming":
-                chunks.append(event.get("content", "") or "")
-            elif et in {"error", "exception"}:
-                raise RuntimeError(f"Backboard stream error: {event}")
-
-        return "".join(chunks).strip()
-
-    def parse_or_raise(raw: str, tag: str) -> dict:
-        raw = (raw or "").strip()
-        cooked = _strip_json_fences(raw)
-        if not cooked:
-            raise RuntimeError(f"[{tag}] Empty LLM response after cleanup. provider={provider} model={model}")
+    meta = {"provider": provider, "model": model, "cache": "MISS"}
+    return out, meta
 
-        try:
-            obj = json.loads(cooked)
-        except Exception as e:
-            preview = cooked[:700]
-            raise RuntimeError(
-                f"[{tag}] Invalid JSON from LLM after cleanup. provider={provider} model={model} "
-                f"len={len(cooked)} preview={preview!r}"
-            ) from e
-
-        if not isinstance(obj, dict):
-            raise RuntimeError(f"[{tag}] JSON was not an object. provider={provider} model={model} type={type(obj)}")
-        return obj
 
-    # -------- main call --------
-    text1 = await run_once(prompt)
+async def bb_json_stream(
+    thread_id: str,
+    prompt: str,
+    action: str,
+    cache_key: Optional[str] = None,
+    cache_scope: Optional[str] = None,
+):
+    """Streaming bb_json: yields ("delta", text) as the model writes, then ("done", (out, meta)).
+
+    Cache hits yield only the "done" item. A reply that doesn't parse gets the
+    same non-streamed repair pass as bb_json.
+    """
+    provider, model = pick_model_for_action(action)
+
+    if not bb:
+        raise RuntimeError("BACKBOARD_API_KEY not set")
+
+    cache_thread = cache_scope or thread_id
+
+    if cache_key:
+        hit = await cache_lookup(cache_thread, action, cache_key)
+        if hit:
+            yield "done", (hit["data"], hit["meta"] | {"cache": "HIT"})
+            return
+
+    buf = io.StringIO()
+    async for chunk in _bb_stream_chunks(thread_id, prompt, provider, model):
+        buf.write(chunk)
+        yield "delta", chunk
+
     try:
-        out = parse_or_raise(text1, "FIRST")
+        out = _parse_llm_json(buf.getvalue().strip(), "FIRST", provider, model)
     except Exception:
-        repair = (
-            "Output ONLY raw JSON with no markdown, no triple backticks, no prose.\n"
-            "Return ONLY the JSON object.\n\n"
-            "ORIGINAL INSTRUCTION:\n" + prompt
-        )
-        text2 = await run_once(repair)
-        out = parse_or_raise(text2, "REPAIR")
+        text2 = await _bb_text(thread_id, _repair_prompt(prompt), provider, model)
+        out = _parse_llm_json(text2, "REPAIR", provider, model)
 
     if cache_key:
-        cache_put(thread_id, action, cache_key, out, provider, model)
+        await asyncio.to_thread(cache_put, cache_thread, action, cache_key, out, provider, model)
 
-    meta = {"provider": provider, "model": model, "cache": "MISS"}
-    return out, meta
+    yield "done", (out, {"provider": provider, "model": model, "cache": "MISS"})
 
 
 # ---------------- Topic classification (fixed list) ----------------
+_TOPIC_PROMPT_HEAD = (
+    "You MUST output ONLY valid JSON. No markdown. No extra text.\n"
+    "Task: choose the SINGLE best topic from the allowed list.\n"
+    'Return JSON: { "topic": string }\n'
+    "Rules:\n"
+    "- You MUST choose exactly one topic from the list below.\n"
+    "- Do NOT invent new topics.\n"
+    "- Choose the most general applicable topic.\n\n"
+    f"ALLOWED TOPICS:\n{FIXED_TOPICS_JOINED}\n\n"
+)
+
+
 async def classify_topic(title: str, content: str) -> tuple[str, dict]:
     thread_id = await get_ingest_thread_backboard()
 
     sample = (content or "")[:6000]
-    topic_list = ", ".join(FIXED_TOPICS)
 
-    prompt = (
-        "You MUST output ONLY valid JSON. No markdown. No extra text.\n"
-        "Task: choose the SINGLE best topic from the allowed list.\n"
-        'Return JSON: { "topic": string }\n'
-        "Rules:\n"
-        "- You MUST choose exactly one topic from the list below.\n"
-        "- Do NOT invent new topics.\n"
-        "- Choose the most general applicable topic.\n\n"
-        f"ALLOWED TOPICS:\n{topic_list}\n\n"
-        f"TITLE:\n{title}\n\n"
-        f"CONTENT:\n{sample}"
-    )
+    prompt = f"{_TOPIC_PROMPT_HEAD}TITLE:\n{title}\n\nCONTENT:\n{sample}"
 
     ck = _mk_cache_key(["TOPIC_FIXED_V1", title.strip()[:200], sample[:2000]])
     out, meta = await bb_json(thread_id, prompt, "TOPIC", cache_key=ck)
 
     topic = str(out.get("topic") or "").strip().lower()
-    if topic not in FIXED_TOPICS:
+    if topic not in FIXED_TOPICS_SET:
         topic = "equity markets"
     return topic, meta
 
 
 # ---------------- Belief distillation + alert ----------------
+_DISTILL_PROMPT_HEAD = (
+    "You MUST output ONLY valid JSON. No markdown.\n"
+    "Task: convert the user's stance into a specific belief proposition that can recur across articles.\n"
+    "Return JSON with keys:\n"
+    '{ "belief_key": string, "belief_text": string, "confidence": "low"|"medium"|"high", '
+    '"conditions": array of strings, "why_now": string }\n'
+    "Rules:\n"
+    "- belief_key: 2-6 words, lowercase, no names/dates.\n"
+    "- belief_text: ONE durable sentence; avoid article-specific details.\n"
+    "- conditions: 0-3 short conditions/assumptions.\n"
+    "- why_now: one short sentence tying it to the current claim.\n"
+    "- Do NOT just restate the topic.\n\n"
+)
+
+_ALERT_PROMPT_HEAD = (
+    "You MUST output ONLY valid JSON. No markdown.\n"
+    "Task: decide if the NEW belief conflicts with any PRIOR belief on the SAME topic.\n"
+    'Return JSON: { "type": "none"|"shift"|"conflict"|"duplicate"|"distinct", '
+    '"message": string, "conflicts_with_id": number|null }\n'
+    "Definitions:\n"
+    "- duplicate: same proposition as a prior belief.\n"
+    "- shift: same proposition but stance changed.\n"
+    "- conflict: incompatible propositions OR stance contradicts a close equivalent.\n"
+    "- distinct: different proposition (no issue).\n"
+    "- none: no alert.\n"
+    "Rules:\n"
+    "- Only raise conflict/shift if fairly confident.\n"
+    "- message should be 1–2 short sentences.\n\n"
+)
+
+
 async def distill_belief(topic: str, vote: str, claim: str, user_note: str) -> tuple[dict, dict]:
     thread_id = await get_ingest_thread_backboard()
 
     prompt = (
-        "You MUST output ONLY valid JSON. No markdown.\n"
-        "Task: convert the user's stance into a specific belief proposition that can recur across articles.\n"
-        "Return JSON with keys:\n"
-        '{ "belief_key": string, "belief_text": string, "confidence": "low"|"medium"|"high", '
-        '"conditions": array of strings, "why_now": string }\n'
-        "Rules:\n"
-        "- belief_key: 2-6 words, lowercase, no names/dates.\n"
-        "- belief_text: ONE durable sentence; avoid article-specific details.\n"
-        "- conditions: 0-3 short conditions/assumptions.\n"
-        "- why_now: one short sentence tying it to the current claim.\n"
-        "- Do NOT just restate the topic.\n\n"
-        f"TOPIC: {topic}\n"
-        f"STANCE: {vote}\n"
-        f"CLAIM: {claim}\n"
-        f"USER_NOTE: {user_note or ''}\n"
+        f"{_DISTILL_PROMPT_HEAD}TOPIC: {topic}\nSTANCE: {vote}\nCLAIM: {claim}\nUSER_NOTE: {user_note or ''}\n"
     )
 
     ck = _mk_cache_key(["DISTILL_BELIEF_V1", topic, vote, (claim or "")[:400], (user_note or "")[:200]])
@@ -651,24 +1059,8 @@ async def compare_beliefs_for_alert(topic: str, new_belief: dict, prior_beliefs:
             }
         )
 
-    prompt = (
-        "You MUST output ONLY valid JSON. No markdown.\n"
-        "Task: decide if the NEW belief conflicts with any PRIOR belief on the SAME topic.\n"
-        'Return JSON: { "type": "none"|"shift"|"conflict"|"duplicate"|"distinct", '
-        '"message": string, "conflicts_with_id": number|null }\n'
-        "Definitions:\n"
-        "- duplicate: same proposition as a prior belief.\n"
-        "- shift: same proposition but stance changed.\n"
-        "- conflict: incompatible propositions OR stance contradicts a close equivalent.\n"
-        "- distinct: different proposition (no issue).\n"
-        "- none: no alert.\n"
-        "Rules:\n"
-        "- Only raise conflict/shift if fairly confident.\n"
-        "- message should be 1–2 short sentences.\n\n"
-        f"TOPIC: {topic}\n"
-        f"NEW: {json.dumps(new_belief, ensure_ascii=False)}\n"
-        f"PRIOR: {json.dumps(prior, ensure_ascii=False)}\n"
-    )
+    prior_json = _dumps(prior)
+    prompt = f"{_ALERT_PROMPT_HEAD}TOPIC: {topic}\nNEW: {_dumps(new_belief)}\nPRIOR: {prior_json}\n"
 
     ck = _mk_cache_key(
         [
@@ -677,7 +1069,7 @@ async def compare_beliefs_for_alert(topic: str, new_belief: dict, prior_beliefs:
             (new_belief.get("belief_key") or "")[:80],
             (new_belief.get("belief_text") or "")[:200],
             (new_belief.get("stance") or "")[:10],
-            json.dumps(prior, ensure_ascii=False)[:800],
+            prior_json[:800],
         ]
     )
     out, meta = await bb_json(thread_id, prompt, "BELIEF_ALERT", cache_key=ck)
@@ -692,13 +1084,37 @@ async def compare_beliefs_for_alert(topic: str, new_belief: dict, prior_beliefs:
         cid = int(cid) if cid is not None else None
     except Exception:
         cid = None
+    # Only ids we showed the model are meaningful (and safe to store/serialize).
+    if cid not in {p["id"] for p in prior}:
+        cid = None
 
     return {"type": t, "message": msg, "conflicts_with_id": cid}, meta
 
 
 # ---------------- Ledger synthesis ----------------
+_LEDGER_PROMPT_HEAD = (
+    "You MUST output ONLY valid JSON. No markdown.\n"
+    "Task: Synthesize the user's overall position for this TOPIC based on the belief list.\n"
+    "Return JSON with EXACT keys:\n"
+    '{'
+    '"summary": string, '
+    '"position_label": "leans agree"|"leans disagree"|"mixed/conditional"|"unclear", '
+    '"confidence": "low"|"medium"|"high", '
+    '"top_themes": array of strings, '
+    '"drift": {"status":"stable"|"shifting"|"recently_changed","note":string}, '
+    '"representative_belief_ids": array of numbers'
+    "}\n"
+    "Rules:\n"
+    "- summary: 1–2 sentences.\n"
+    "- top_themes: 3–5 short items.\n"
+    "- representative_belief_ids: choose 2–4 ids from the list.\n"
+    "- position_label MUST be one of the allowed strings.\n"
+    "- confidence should reflect consistency + amount of evidence.\n\n"
+)
+
+
 async def synthesize_ledger_topic(user_id: str, topic: str, beliefs: list[dict]) -> tuple[dict, dict]:
-    thread_id = await get_ingest_thread_backboard()
+    ingest_thread_id = await get_ingest_thread_backboard()
 
     items = []
     for b in (beliefs or [])[:40]:
@@ -715,29 +1131,17 @@ async def synthesize_ledger_topic(user_id: str, topic: str, beliefs: list[dict])
     latest_ts = (items[0].get("created_at") if items else "") or ""
     ck = _mk_cache_key(["LEDGER_V1", user_id, topic, str(len(items)), str(latest_ts)])
 
-    prompt = (
-        "You MUST output ONLY valid JSON. No markdown.\n"
-        "Task: Synthesize the user's overall position for this TOPIC based on the belief list.\n"
-        "Return JSON with EXACT keys:\n"
-        '{'
-        '"summary": string, '
-        '"position_label": "leans agree"|"leans disagree"|"mixed/conditional"|"unclear", '
-        '"confidence": "low"|"medium"|"high", '
-        '"top_themes": array of strings, '
-        '"drift": {"status":"stable"|"shifting"|"recently_changed","note":string}, '
-        '"representative_belief_ids": array of numbers'
-        "}\n"
-        "Rules:\n"
-        "- summary: 1–2 sentences.\n"
-        "- top_themes: 3–5 short items.\n"
-        "- representative_belief_ids: choose 2–4 ids from the list.\n"
-        "- position_label MUST be one of the allowed strings.\n"
-        "- confidence should reflect consistency + amount of evidence.\n\n"
-        f"TOPIC: {topic}\n"
-        f"BELIEFS (newest first):\n{json.dumps(items, ensure_ascii=False)}\n"
-    )
+    prompt = f"{_LEDGER_PROMPT_HEAD}TOPIC: {topic}\nBELIEFS (newest first):\n{_dumps(items)}\n"
 
-    out, meta = await bb_json(thread_id, prompt, "LEDGER", cache_key=ck)
+    # /ledger runs topics concurrently, so each uncached call gets its own throwaway
+    # thread and never sees another topic's turns. Results stay cached under the
+    # ingest thread, as before.
+    hit = await cache_lookup(ingest_thread_id, "LEDGER", ck)
+    if hit:
+        out, meta = hit["data"], hit["meta"] | {"cache": "HIT"}
+    else:
+        async with scratch_thread_backboard() as thread_id:
+            out, meta = await bb_json(thread_id, prompt, "LEDGER", cache_key=ck, cache_scope=ingest_thread_id)
 
     pl = str(out.get("position_label") or "unclear").strip().lower()
     if pl not in {"leans agree", "leans disagree", "mixed/conditional", "unclear"}:
@@ -800,44 +1204,49 @@ def seed_if_empty():
                 ),
             ),
         )
-        conn.commit()
 
 
-seed_if_empty()
-
 # ===================== ROUTES =====================
 
+_last_ts: tuple[int, str] = (0, "")
+
+
+def _utc_now_iso() -> str:
+    # Second resolution is plenty for /health; reuse the string within the same second.
+    global _last_ts
+    now = int(time.time())
+    if _last_ts[0] != now:
+        _last_ts = (now, time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime(now)))
+    return _last_ts[1]
+
+
+# Pure-DB routes are plain `def` so Starlette runs them in its threadpool.
 @api.get("/health")
-async def health():
-    return {"ok": True, "mode": "local", "time": datetime.utcnow().isoformat() + "Z"}
+def health():
+    return {"ok": True, "mode": "local", "time": _utc_now_iso()}
 
 
 @api.get("/articles")
-async def list_articles():
-    rows = cur.execute(
-        "SELECT id, title, topic, created_at FROM articles ORDER BY created_at DESC LIMIT 200"
-    ).fetchall()
-    return {
-        "data": [
-            {"id": r["id"], "title": r["title"], "topic": r["topic"], "created_at": r["created_at"]}
-            for r in rows
-        ]
-    }
+def list_articles():
+    # SQLite builds the JSON array itself; no per-row Python objects or re-serialization.
+    payload = ro_cur().execute(SQL_LIST_ARTICLES_JSON).fetchone()[0]
+    return Response(content=f'{{"data":{payload}}}', media_type="application/json")
 
 
 @api.get("/articles/{article_id}")
-async def get_article(article_id: str):
+def get_article(article_id: str):
     r = db_get_article(article_id)
     if not r:
         raise HTTPException(status_code=404, detail="Unknown article_id")
+    id_, title, topic, url, content, created_at = r
     return {
         "data": {
-            "id": r["id"],
-            "title": r["title"],
-            "topic": r["topic"],
-            "url": r["url"],
-            "content": r["content"],
-            "created_at": r["created_at"],
+            "id": id_,
+            "title": title,
+            "topic": topic,
+            "url": url,
+            "content": content,
+            "created_at": created_at,
         }
     }
 
@@ -856,11 +1265,7 @@ async def ingest_article(req: IngestReq):
     topic, meta = await classify_topic(title, content)
     article_id = f"a_{uuid.uuid4().hex[:10]}"
 
-    cur.execute(
-        "INSERT INTO articles(id, title, topic, url, content) VALUES (?,?,?,?,?)",
-        (article_id, title, topic, url, content),
-    )
-    conn.commit()
+    await asyncio.to_thread(insert_article, article_id, title, topic, url, content)
 
     return {
         "ok": True,
@@ -869,6 +1274,20 @@ async def ingest_article(req: IngestReq):
     }
 
 
+_EXPLAIN_PROMPT_HEAD = (
+    "You MUST output ONLY valid JSON. No markdown. No extra commentary.\n"
+    "Return STRICT JSON with keys:\n"
+    "context: { issue: string, background: array of strings}\n"
+    "argument: { thesis: string, reasons: array of strings, assumptions: array of strings }\n"
+    "Rules:\n"
+    "- Do NOT summarize.\n"
+    "- Context is neutral orientation.\n"
+    "- Argument reflects the author's position.\n"
+    "- Keep bullets concise and have ideally 3 for reasons and 3 for assumptions.\n"
+    "\nARTICLE:\n"
+)
+
+
 @api.post("/articles/ingest_and_explain")
 async def ingest_and_explain(req: IngestAndExplainReq):
     user_id = (req.user_id or "").strip()
@@ -883,35 +1302,39 @@ async def ingest_and_explain(req: IngestAndExplainReq):
     if not content or len(content) < 80:
         raise HTTPException(status_code=400, detail="content is required (min ~80 chars)")
 
-    topic, meta_topic = await classify_topic(title, content)
     article_id = f"a_{uuid.uuid4().hex[:10]}"
+    # EXPLAIN needs a Backboard thread up front, but its `threads` row is only stored
+    # with the article below, so a failed call leaves no row for a missing article.
+    assistant_id = await get_or_create_assistant_backboard(user_id)
+    thread_id = str((await bb.create_thread(assistant_id)).thread_id)
+    article_text = content[:12000]
 
-    cur.execute(
-        "INSERT INTO articles(id, title, topic, url, content) VALUES (?,?,?,?,?)",
-        (article_id, title, topic, url, content),
-    )
-    conn.commit()
+    prompt = _EXPLAIN_PROMPT_HEAD + article_text
+    ck = _mk_cache_key(["EXPLAIN_V1", article_id, article_text[:2000]])
 
-    thread_id = await get_or_create_thread_backboard(user_id, article_id)
-    article_text = get_article_text(article_id, max_chars=12000)
+    # Explaining doesn't need the topic, so both LLM calls run concurrently.
+    try:
+        (topic, meta_topic), (out, meta_explain) = await asyncio.gather(
+            classify_topic(title, content),
+            bb_json(thread_id, prompt, "EXPLAIN", cache_key=ck),
+        )
+    except Exception:
+        await discard_thread_backboard(thread_id)
+        raise
 
-    prompt = (
-        "You MUST output ONLY valid JSON. No markdown. No extra commentary.\n"
-        "Return STRICT JSON with keys:\n"
-        "context: { issue: string, background: array of strings}\n"
-        "argument: { thesis: string, reasons: array of strings, assumptions: array of strings }\n"
-        "Rules:\n"
-        "- Do NOT summarize.\n"
-        "- Context is neutral orientation.\n"
-        "- Argument reflects the author's position.\n"
-        "- Keep bullets concise and have ideally 3 for reasons and 3 for assumptions.\n"
-        f"\nARTICLE:\n{article_text}"
-    )
+    def _store() -> None:
+        with txn():
+            insert_article(article_id, title, topic, url, content)
+            _db_put_thread_id(user_id, article_id, thread_id)
+            log_message(thread_id, role="user", action="EXPLAIN", content="EXPLAIN (auto) requested")
+            log_message(thread_id, role="assistant", action="EXPLAIN", content=_dumps(out))
 
-    log_message(thread_id, role="user", action="EXPLAIN", content="EXPLAIN (auto) requested")
-    ck = _mk_cache_key(["EXPLAIN_V1", article_id, article_text[:2000]])
-    out, meta_explain = await bb_json(thread_id, prompt, "EXPLAIN", cache_key=ck)
-    log_message(thread_id, role="assistant", action="EXPLAIN", content=json.dumps(out, ensure_ascii=False))
+    try:
+        await asyncio.to_thread(_store)
+    except Exception:
+        await discard_thread_backboard(thread_id)
+        raise
+    _thread_id_cache.put((user_id, article_id), thread_id)
 
     return {
         "ok": True,
@@ -943,8 +1366,18 @@ async def thread(req: ThreadReq):
     return {"thread_id": thread_id}
 
 
+_ALIGN_PROMPT_HEAD = (
+    "You MUST output ONLY valid JSON. No markdown.\n"
+    "Task: compare the article's thesis with the user's belief.\n"
+    'Return JSON: { "position": "reinforces|contradicts|partially overlaps|unrelated", "summary": string }\n\n'
+    "ARTICLE_THESIS:\n"
+)
+_ALIGN_PROMPT_MID = "\n\nUSER_BELIEF:\n"
+_ALIGN_PROMPT_SUF = "\n(Stance: "
+
+
 @api.post("/action")
-async def action(req: ActionReq):
+async def action(req: ActionReq, stream: bool = False):
     thread_id = await get_or_create_thread_backboard(req.user_id, req.article_id)
 
     # ---------------- VOTE ----------------
@@ -953,15 +1386,17 @@ async def action(req: ActionReq):
             raise HTTPException(status_code=400, detail="vote is required for VOTE")
 
         topic = (req.topic or "equity markets").strip().lower()
-        if topic not in FIXED_TOPICS:
+        if topic not in FIXED_TOPICS_SET:
             topic = "equity markets"
 
         claim = (req.content or "").strip()
         user_note = (req.note or "").strip()
 
-        priors = fetch_recent_beliefs_for_topic(req.user_id, topic, limit=12)
-
-        distilled, meta_mem = await distill_belief(topic, req.vote, claim, user_note)
+        # Prior beliefs (DB) and distillation (LLM) are independent; overlap them.
+        priors, (distilled, meta_mem) = await asyncio.gather(
+            asyncio.to_thread(fetch_recent_belief_briefs, req.user_id, topic, 12),
+            distill_belief(topic, req.vote, claim, user_note),
+        )
 
         new_belief_obj = {
             "belief_key": distilled.get("belief_key"),
@@ -982,32 +1417,30 @@ async def action(req: ActionReq):
             "alert_conflicts_with_id": alert.get("conflicts_with_id"),
         }
 
-        cur.execute(
-            """
-            INSERT INTO beliefs(
-                user_id, topic, stance, note, evidence,
-                belief_key, belief_text, confidence, conditions_json, claim
-            ) VALUES (?,?,?,?,?,?,?,?,?,?)
-            """,
-            (
-                req.user_id,
-                topic,
-                req.vote,
-                (user_note or None),
-                json.dumps(evidence_obj, ensure_ascii=False),
-                distilled.get("belief_key"),
-                distilled.get("belief_text"),
-                distilled.get("confidence"),
-                json.dumps(distilled.get("conditions") or [], ensure_ascii=False),
-                (claim or None),
-            ),
-        )
-        conn.commit()
-
         msg = f"VOTE: {req.vote} (topic='{topic}')"
         if user_note and user_note.strip():
             msg += f" note='{user_note.strip()[:120]}'"
-        log_message(thread_id, role="user", action="VOTE", content=msg)
+
+        def _store() -> None:
+            with txn():
+                cur.execute(
+                    SQL_INSERT_BELIEF,
+                    (
+                        req.user_id,
+                        topic,
+                        req.vote,
+                        (user_note or None),
+                        _dumps(evidence_obj),
+                        distilled.get("belief_key"),
+                        distilled.get("belief_text"),
+                        distilled.get("confidence"),
+                        _dumps(distilled.get("conditions") or []),
+                        (claim or None),
+                    ),
+                )
+
+        await asyncio.to_thread(_store)
+        log_message_later(thread_id, role="user", action="VOTE", content=msg)
 
         return {
             "action": "VOTE",
@@ -1030,93 +1463,92 @@ async def action(req: ActionReq):
             raise HTTPException(status_code=400, detail="content is required for ALIGN")
 
         try:
-            payload = json.loads(req.content)
-        except Exception:
+            payload = _loads(req.content)
+        except orjson.JSONDecodeError:
             payload = {}
 
         thesis = payload.get("thesis", "")
         belief_text = payload.get("belief_text", "")
         stance = payload.get("stance", "")
 
-        prompt = (
-            "You MUST output ONLY valid JSON. No markdown.\n"
-            "Task: compare the article's thesis with the user's belief.\n"
-            'Return JSON: { "position": "reinforces|contradicts|partially overlaps|unrelated", "summary": string }\n\n'
-            f"ARTICLE_THESIS:\n{thesis}\n\n"
-            f"USER_BELIEF:\n{belief_text}\n"
-            f"(Stance: {stance})"
-        )
-
-        ck = _mk_cache_key(["ALIGN_V1", thesis[:200], belief_text[:200], stance])
-        out, meta = await bb_json(thread_id, prompt, "ALIGN", cache_key=ck)
-
-        log_message(thread_id, role="assistant", action="ALIGN", content=json.dumps(out, ensure_ascii=False))
+        # Order matters for provider-side prefix caching: static instructions, then the
+        # article thesis (shared by everyone reading it), then the per-user belief.
+        prompt = "".join((_ALIGN_PROMPT_HEAD, thesis, _ALIGN_PROMPT_MID, belief_text, _ALIGN_PROMPT_SUF, stance, ")"))
+
+        # The comparison depends only on these inputs, so results are shared
+        # across users' threads and keyed on the full whitespace/case-normalized text
+        # (a truncated prefix would let distinct theses collide across articles).
+        ck = _mk_cache_key(["ALIGN_V3", _norm_text(thesis), _norm_text(belief_text), _norm_text(stance)])
+
+        def _align_body(out: dict, meta: dict) -> dict:
+            return {
+                "action": "ALIGN",
+                "ok": True,
+                "thread_id": thread_id,
+                "response": out,
+                "model": meta.get("model"),
+                "provider": meta.get("provider"),
+                "cache": meta.get("cache"),
+            }
 
-        return {
-            "action": "ALIGN",
-            "ok": True,
-            "thread_id": thread_id,
-            "response": out,
-            "model": meta.get("model"),
-            "provider": meta.get("provider"),
-            "cache": meta.get("cache"),
-        }
+        # ?stream=true: NDJSON of {"delta": ...} frames, then the usual body as the last line.
+        if stream:
+            async def _frames():
+                try:
+                    async for kind, value in bb_json_stream(
+                        thread_id, prompt, "ALIGN", cache_key=ck, cache_scope=ALIGN_CACHE_SCOPE
+                    ):
+                        if kind == "delta":
+                            yield orjson.dumps({"delta": value}) + b"\n"
+                        else:
+                            out, meta = value
+                            log_message_later(thread_id, role="assistant", action="ALIGN", content=_dumps(out))
+                            yield orjson.dumps(_align_body(out, meta)) + b"\n"
+                except Exception:
+                    # Headers are already sent, so report failures in-band; details
+                    # (LLM output previews, raw Backboard events) stay in the log.
+                    log.exception("ALIGN stream failed")
+                    yield b'{"ok":false,"error":"align failed"}\n'
+
+            return StreamingResponse(_frames(), media_type="application/x-ndjson")
+
+        out, meta = await bb_json(thread_id, prompt, "ALIGN", cache_key=ck, cache_scope=ALIGN_CACHE_SCOPE)
+
+        log_message_later(thread_id, role="assistant", action="ALIGN", content=_dumps(out))
+
+        return _align_body(out, meta)
 
     raise HTTPException(status_code=400, detail="unknown action")
 
 
+# Routes returning bulk rows we built ourselves hand back an ORJSONResponse directly,
+# so FastAPI skips its jsonable_encoder pass over the payload.
 @api.get("/messages")
 async def messages(user_id: str, article_id: str, limit: int = 200):
     thread_id = await get_or_create_thread_backboard(user_id, article_id)
-    return {"thread_id": thread_id, "mode": "local", "data": get_thread_messages(thread_id, limit=limit)}
+    data = await asyncio.to_thread(get_thread_messages, thread_id, limit)
+    return ORJSONResponse({"thread_id": thread_id, "mode": "local", "data": data})
 
 
 @api.get("/beliefs")
-async def beliefs(user_id: str, topic: Optional[str] = None, limit: int = 20):
+def beliefs(user_id: str, topic: Optional[str] = None, limit: int = 20):
     if topic:
         t = topic.strip().lower()
-        data = fetch_recent_beliefs_for_topic(user_id, t, limit=limit)
+        data = fetch_recent_beliefs(user_id, t, limit=limit)
     else:
         data = fetch_recent_beliefs(user_id, limit=limit)
-    return {"user_id": user_id, "topic": topic, "data": data, "mode": "local"}
+    return ORJSONResponse({"user_id": user_id, "topic": topic, "data": data, "mode": "local"})
 
 
 @api.get("/beliefs/latest")
-async def latest_belief(user_id: str, topic: str):
+def latest_belief(user_id: str, topic: str):
     t = topic.strip().lower()
-    row = cur.execute(
-        """
-        SELECT id, topic, stance, note, evidence, created_at,
-               belief_key, belief_text, confidence, conditions_json, claim
-        FROM beliefs
-        WHERE user_id=? AND topic=?
-        ORDER BY created_at DESC
-        LIMIT 1
-        """,
-        (user_id, t),
-    ).fetchone()
+    rows = fetch_recent_beliefs(user_id, t, limit=1)
+    return ORJSONResponse({"user_id": user_id, "topic": t, "data": rows[0] if rows else None, "mode": "local"})
 
-    if not row:
-        return {"user_id": user_id, "topic": t, "data": None, "mode": "local"}
 
-    return {
-        "user_id": user_id,
-        "topic": t,
-        "data": {
-            "id": row["id"],
-            "topic": row["topic"],
-            "stance": row["stance"],
-            "note": row["note"],
-            "evidence": _safe_json(row["evidence"]),
-            "created_at": row["created_at"],
-            "belief_key": row["belief_key"],
-            "belief_text": row["belief_text"],
-            "confidence": row["confidence"],
-            "conditions": _safe_json_list(row["conditions_json"]),
-            "claim": row["claim"],
-        },
-        "mode": "local",
-    }
+# Caps in-flight ledger LLM calls across all /ledger requests, to stay under provider rate limits.
+_ledger_llm_slots = asyncio.Semaphore(6)
 
 
 @api.get("/ledger")
@@ -1125,60 +1557,52 @@ async def ledger(user_id: str, limit_per_topic: int = 40, min_count: int = 3):
     if not uid:
         raise HTTPException(status_code=400, detail="user_id is required")
 
-    out_rows = []
+    by_topic = await asyncio.to_thread(fetch_recent_beliefs_by_topic, uid, min(limit_per_topic, 80))
 
-    for t in FIXED_TOPICS:
-        beliefs = fetch_recent_beliefs_for_topic(uid, t, limit=min(limit_per_topic, 80))
+    async def _one_topic(t: str) -> dict:
+        beliefs = by_topic.get(t, [])
         evidence_count = len(beliefs)
         last_updated = beliefs[0]["created_at"] if evidence_count else None
 
         if evidence_count < int(min_count):
-            out_rows.append(
-                {
-                    "topic": t,
-                    "enough_data": False,
-                    "summary": "",
-                    "position_label": "unclear",
-                    "confidence": "low",
-                    "evidence_count": evidence_count,
-                    "last_updated": last_updated,
-                    "drift": {"status": "stable", "note": ""},
-                    "top_themes": [],
-                    "representative_beliefs": [],
-                }
-            )
-            continue
-
-        synth, meta = await synthesize_ledger_topic(uid, t, beliefs)
-
-        id_to_belief = {int(b["id"]): b for b in beliefs if b.get("id") is not None}
-        rep = []
-        for bid in synth.get("representative_belief_ids", [])[:4]:
-            try:
-                b = id_to_belief.get(int(bid))
-            except Exception:
-                b = None
-            if b:
-                rep.append(b)
-
-        out_rows.append(
-            {
+            return {
                 "topic": t,
-                "enough_data": True,
-                "summary": synth.get("summary", ""),
-                "position_label": synth.get("position_label", "unclear"),
-                "confidence": synth.get("confidence", "medium"),
+                "enough_data": False,
+                "summary": "",
+                "position_label": "unclear",
+                "confidence": "low",
                 "evidence_count": evidence_count,
                 "last_updated": last_updated,
-                "drift": synth.get("drift", {"status": "stable", "note": ""}),
-                "top_themes": synth.get("top_themes", []),
-                "representative_beliefs": rep,
-                "ledger_meta": {
-                    "model": meta.get("model"),
-                    "provider": meta.get("provider"),
-                    "cache": meta.get("cache"),
-                },
+                "drift": {"status": "stable", "note": ""},
+                "top_themes": [],
+                "representative_beliefs": [],
             }
-        )
 
-    return {"user_id": uid, "data": out_rows, "mode": "local"}
+        async with _ledger_llm_slots:
+            synth, meta = await synthesize_ledger_topic(uid, t, beliefs)
+
+        # Row ids are INTEGER PRIMARY KEYs and synthesize_ledger_topic already coerced the LLM's ids.
+        id_to_belief = {b["id"]: b for b in beliefs}
+        rep = [id_to_belief[bid] for bid in synth.get("representative_belief_ids", [])[:4] if bid in id_to_belief]
+
+        return {
+            "topic": t,
+            "enough_data": True,
+            "summary": synth.get("summary", ""),
+            "position_label": synth.get("position_label", "unclear"),
+            "confidence": synth.get("confidence", "medium"),
+            "evidence_count": evidence_count,
+            "last_updated": last_updated,
+            "drift": synth.get("drift", {"status": "stable", "note": ""}),
+            "top_themes": synth.get("top_themes", []),
+            "representative_beliefs": rep,
+            "ledger_meta": {
+                "model": meta.get("model"),
+                "provider": meta.get("provider"),
+                "cache": meta.get("cache"),
+            },
+        }
+
+    # Topics are independent (own rows, own prompt), so synthesize them concurrently.
+    out_rows = await asyncio.gather(*(_one_topic(t) for t in FIXED_TOPICS))
+    return ORJSONResponse({"user_id": uid, "data": list(out_rows), "mode": "local"})